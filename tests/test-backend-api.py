@@ -6,80 +6,323 @@ Tests the faster-whisper-server backend API using Python
 Requirements: pip install -r ../requirements.txt
 """
 
+import asyncio
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.filepost import encode_multipart_formdata
+from urllib3.util.retry import Retry
 import time
+import io
 import json
+import math
 import os
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, List, Tuple
+import threading
+import wave
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:  # optional: stdlib json is slower but equivalent
+    json_loads = json.loads
+
+try:
+    import httpx
+except ImportError:  # optional: falls back to the thread-pool path
+    httpx = None
+
+try:
+    import aiohttp
+except ImportError:  # optional: load test falls back to test_performance
+    aiohttp = None
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Transport-level failures that count as a failed request rather than a crash
+REQUEST_ERRORS = (requests.exceptions.RequestException, asyncio.TimeoutError, OSError) \
+    + ((httpx.HTTPError,) if httpx else ()) \
+    + ((aiohttp.ClientError,) if aiohttp else ())
+
+DEFAULT_SAMPLE_WAV = "/home/leonardo/Workspace/whisper-web-app/backend/whisper-cpp/samples/longer_jfk.wav"
+DEFAULT_SAMPLE_MP3 = "/home/leonardo/Workspace/whisper-web-app/backend/whisper-cpp/samples/longer_jfk.mp3"
+
+DEFAULT_MODEL = 'Systran/faster-whisper-base.en'
+DEFAULT_DATA = {'model': DEFAULT_MODEL}  # shared; requests does not mutate it
+TRANSCRIBE_PATH = '/v1/audio/transcriptions'
+ERROR_PROBE_SECONDS = 0.25
+
+# (test name, positional args, keyword args) for test_transcription
+TRANS_MATRIX = [
+    # Transcription tests
+    ("Basic Transcription", (DEFAULT_MODEL,), {}),
+    ("Transcription with Language", (DEFAULT_MODEL,), {'language': 'en'}),
+    ("Transcription with JSON Response", (DEFAULT_MODEL,), {'response_format': 'json'}),
+    ("Transcription with Verbose JSON", (DEFAULT_MODEL,), {'response_format': 'verbose_json'}),
+
+    # Model tests
+    ("Medium Model Transcription", ('Systran/faster-whisper-medium.en',), {}),
+    ("Multilingual Model", ('Systran/faster-whisper-base',), {'language': 'zh'}),
+
+    # Auto language detection (may fail if not supported)
+    ("Auto Language Detection", ('Systran/faster-whisper-base',), {'language': 'auto'}),
+]
+
+RESET = "\033[0m"
+LOG_PREFIXES = {
+    "red": "\033[0;31m",
+    "green": "\033[0;32m",
+    "yellow": "\033[1;33m",
+    "white": RESET
+}
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
 
 class WhisperAPITester:
-    def __init__(self, base_url: str = "http://localhost:8081"):
+    def __init__(self, base_url: str = "http://localhost:8081",
+                 sample_audio: Optional[str] = None, sample_mp3: Optional[str] = None):
         self.base_url = base_url.rstrip('/')
-        self.sample_audio = "/home/leonardo/Workspace/whisper-web-app/backend/whisper-cpp/samples/longer_jfk.wav"
+        self._trans_url = f"{self.base_url}{TRANSCRIBE_PATH}"
+        self.sample_audio = sample_audio or os.environ.get("WHISPER_SAMPLE_WAV", DEFAULT_SAMPLE_WAV)
+        self.sample_mp3 = sample_mp3 or os.environ.get("WHISPER_SAMPLE_MP3", DEFAULT_SAMPLE_MP3)
         self.tests_run = 0
         self.tests_passed = 0
+        self.tests_skipped = 0
+        self._results_lock = threading.Lock()
+        self._output = threading.local()  # per-thread capture buffer for test output
+        self.latencies_ms: Dict[str, List[float]] = {}  # successful requests, per phase
+
+        # Read the sample audio once and reuse the buffer for every upload
+        self._wav_bytes = None
+        if os.path.isfile(self.sample_audio):
+            with open(self.sample_audio, 'rb') as f:
+                self._wav_bytes = f.read()
+        self._wav_probe_bytes = None
+        self._mp3_bytes = None
+        self._body_cache: Dict[tuple, Tuple[bytes, Dict[str, str]]] = {}
+
+        # Optional in-run memoization (WHISPER_TEST_CACHE=1) of repeated requests
+        self.use_cache = os.environ.get("WHISPER_TEST_CACHE") == "1"
+        self._trans_cache: Dict[tuple, Future] = {}
+        self._models_set = None
+
+        # Shared client so every test reuses pooled keep-alive connections.
+        # httpx (HTTP/2 when h2 is installed) is preferred; set
+        # WHISPER_HTTP_BACKEND=requests to force the requests-backed path.
+        force_requests = os.environ.get("WHISPER_HTTP_BACKEND") == "requests"
+        self.use_httpx = httpx is not None and not force_requests
+        self.use_aiohttp = aiohttp is not None and not force_requests
+        if self.use_httpx:
+            # With a custom transport, httpx ignores client-level limits/http2,
+            # so both are configured on the transport itself
+            transport = httpx.HTTPTransport(
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=10),
+                retries=3
+            )
+            self.client = httpx.Client(timeout=httpx.Timeout(30.0, read=None),
+                                       transport=transport)
+        else:
+            self.client = requests.Session()
+            # Retry transient failures locally instead of failing the whole run
+            retries = Retry(
+                total=3,
+                connect=3,
+                read=2,
+                backoff_factor=0.3,
+                status_forcelist=[500, 502, 503, 504],
+                allowed_methods=['GET', 'POST'],
+                raise_on_status=False
+            )
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retries)
+            self.client.mount("http://", adapter)
+            self.client.mount("https://", adapter)
+
+    def close(self) -> None:
+        """Release pooled connections"""
+        self.client.close()
+
+    def _post_body(self, body: bytes, headers: Dict[str, str], **kwargs):
+        """POST a pre-encoded body to the transcription endpoint"""
+        if self.use_httpx:
+            return self.client.post(self._trans_url, content=body, headers=headers, **kwargs)
+        return self.client.post(self._trans_url, data=body, headers=headers, **kwargs)
+
+    def _post_streamed(self, files: Dict, data: Dict[str, str]) -> Tuple[int, bytes]:
+        """POST to the transcription endpoint, streaming the response body"""
+        if self.use_httpx:
+            with self.client.stream("POST", self._trans_url, files=files, data=data) as response:
+                return response.status_code, response.read()
+        with self.client.post(self._trans_url, files=files, data=data, stream=True) as response:
+            return response.status_code, response.raw.read(decode_content=True)
+
+    def _wav_files(self) -> Dict[str, Tuple[str, bytes, str]]:
+        """Multipart payload for the cached WAV sample"""
+        if self._wav_bytes is None:
+            raise FileNotFoundError(self.sample_audio)
+        return {'file': (os.path.basename(self.sample_audio), self._wav_bytes, 'audio/wav')}
+
+    def _wav_body(self, data: Dict[str, str]) -> Tuple[bytes, Dict[str, str]]:
+        """Encoded multipart body and headers for the WAV sample, built once per form"""
+        key = tuple(sorted(data.items()))
+        cached = self._body_cache.get(key)
+        if cached is None:
+            body, content_type = encode_multipart_formdata({**data, **self._wav_files()})
+            cached = (body, {'Content-Type': content_type})
+            self._body_cache[key] = cached
+        return cached
+
+    def _wav_probe_files(self) -> Dict[str, Tuple[str, bytes, str]]:
+        """Multipart payload for a short, well-formed WAV cut from the sample"""
+        name, wav, content_type = self._wav_files()['file']
+        if self._wav_probe_bytes is None:
+            try:
+                with wave.open(io.BytesIO(wav)) as src:
+                    params = src.getparams()
+                    frames = src.readframes(int(src.getframerate() * ERROR_PROBE_SECONDS))
+                probe = io.BytesIO()
+                with wave.open(probe, 'wb') as dst:
+                    dst.setparams(params)
+                    dst.writeframes(frames)  # header sizes are rewritten on close
+                self._wav_probe_bytes = probe.getvalue()
+            except (wave.Error, EOFError):
+                self._wav_probe_bytes = wav  # not plain PCM; send the full sample
+        return {'file': (name, self._wav_probe_bytes, content_type)}
+
+    def _mp3_files(self, mp3_file: str) -> Dict[str, Tuple[str, bytes, str]]:
+        """Multipart payload for the MP3 sample, loaded on first use"""
+        if self._mp3_bytes is None:
+            with open(mp3_file, 'rb') as f:
+                self._mp3_bytes = f.read()
+        return {'file': (os.path.basename(mp3_file), self._mp3_bytes, 'audio/mpeg')}
 
     def log(self, message: str, color: str = "white") -> None:
         """Simple logging with colors"""
-        colors = {
-            "red": "\033[0;31m",
-            "green": "\033[0;32m",
-            "yellow": "\033[1;33m",
-            "white": "\033[0m"
-        }
-        print(f"{colors.get(color, colors['white'])}{message}{colors['white']}")
-
-    def run_test(self, test_name: str, test_func, *args, **kwargs) -> bool:
-        """Run a single test and track results"""
+        sys.stdout.write(f"{LOG_PREFIXES.get(color, RESET)}{message}{RESET}\n")
+
+    def emit(self, message: str) -> None:
+        """Print test output, or capture it when running inside _call_test"""
+        buffer = getattr(self._output, "buffer", None)
+        if buffer is None:
+            # One write per line so messages from worker threads never merge
+            sys.stdout.write(f"{message}\n")
+        else:
+            buffer.append(message)
+
+    def run_tests_parallel(self, jobs: List[Tuple[str, object]], max_workers: int = 6) -> None:
+        """Run independent tests concurrently, reporting in submission order"""
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [(name, executor.submit(self._call_test, func)) for name, func in jobs]
+            for name, future in futures:
+                self.log(f"\nRunning: {name}", "yellow")
+                self._record_result(*future.result())
+
+    def skip_test(self, test_name: str, reason: str) -> None:
+        """Report a test that cannot run in this environment"""
         self.log(f"\nRunning: {test_name}", "yellow")
-        self.tests_run += 1
+        self._record_result(None, reason)
 
+    def _call_test(self, test_func, *args, **kwargs) -> Tuple[bool, str, List[str]]:
+        """Invoke a test function, returning (passed, error message, captured output)"""
+        self._output.buffer = []
         try:
-            result = test_func(*args, **kwargs)
-            if result:
-                self.log("PASSED", "green")
-                self.tests_passed += 1
-                return True
-            else:
-                self.log("FAILED", "red")
-                return False
+            return bool(test_func(*args, **kwargs)), "", self._output.buffer
         except Exception as e:
-            self.log(f"FAILED: {str(e)}", "red")
+            return False, str(e), self._output.buffer
+        finally:
+            self._output.buffer = None
+
+    def _record_result(self, passed: Optional[bool], error: str,
+                       output: Optional[List[str]] = None) -> bool:
+        """Log a test outcome and update the counters; passed=None means skipped"""
+        for line in output or ():
+            print(line)
+
+        with self._results_lock:
+            if passed is None:
+                self.tests_skipped += 1
+            else:
+                self.tests_run += 1
+                if passed:
+                    self.tests_passed += 1
+
+        if passed is None:
+            self.log(f"SKIPPED: {error}", "yellow")
             return False
+        if passed:
+            self.log("PASSED", "green")
+        elif error:
+            self.log(f"FAILED: {error}", "red")
+        else:
+            self.log("FAILED", "red")
+        return passed
 
     def test_health_check(self) -> bool:
         """Test health endpoint"""
         try:
-            response = requests.get(f"{self.base_url}/health")
+            response = self.client.get(f"{self.base_url}/health")
             if response.status_code == 200 and response.text.strip() == "OK":
-                print("OK")
+                self.emit("OK")
                 return True
             return False
         except Exception as e:
-            print(f"Error: {e}")
+            self.emit(f"Error: {e}")
             return False
 
     def test_models_list(self) -> bool:
         """Test models list endpoint"""
         try:
-            response = requests.get(f"{self.base_url}/v1/models")
+            response = self.client.get(f"{self.base_url}/v1/models")
             if response.status_code == 200:
                 data = response.json()
                 if 'data' in data and len(data['data']) > 0:
-                    print("true")
+                    self._models_set = {m.get('id') for m in data['data']}
+                    self.emit("true")
                     return True
             return False
         except Exception as e:
-            print(f"Error: {e}")
+            self.emit(f"Error: {e}")
             return False
 
     def test_transcription(self, model: str, language: str = None,
                           response_format: str = "json") -> Tuple[bool, str]:
         """Test transcription with various parameters"""
+        if not self.use_cache:
+            return self._transcribe(model, language, response_format)
+
+        # The cache holds futures so concurrent callers with the same key
+        # share a single request instead of racing to fill the entry
+        key = (model, language, response_format, len(self._wav_bytes or b""))
+        with self._results_lock:
+            future = self._trans_cache.get(key)
+            owner = future is None
+            if owner:
+                future = self._trans_cache[key] = Future()
+
+        if not owner:
+            result = future.result()
+            self.emit(f"(cached) {result[1]}" if result[0] else "(cached) failed")
+            return result
+
+        result = self._transcribe(model, language, response_format)
+        if not result[0]:
+            with self._results_lock:
+                del self._trans_cache[key]
+        future.set_result(result)
+        return result
+
+    def _transcribe(self, model: str, language: str = None,
+                    response_format: str = "json") -> Tuple[bool, str]:
+        """POST the sample audio for transcription"""
         try:
-            files = {'file': open(self.sample_audio, 'rb')}
             data = {
                 'model': model,
                 'response_format': response_format
@@ -87,181 +330,315 @@ class WhisperAPITester:
             if language:
                 data['language'] = language
 
-            response = requests.post(
-                f"{self.base_url}/v1/audio/transcriptions",
-                files=files,
-                data=data
-            )
+            body, headers = self._wav_body(data)
+            response = self._post_body(body, headers)
 
             if response.status_code == 200:
-                result = response.json()
+                result = json_loads(response.content)
                 if 'text' in result and result['text']:
-                    print(result['text'])
+                    self.emit(result['text'])
                     return True, result['text']
                 else:
-                    print("No text in response")
+                    self.emit("No text in response")
                     return False, ""
             else:
-                print(f"HTTP {response.status_code}: {response.text}")
+                self.emit(f"HTTP {response.status_code}: {response.text}")
                 return False, ""
         except Exception as e:
-            print(f"Error: {e}")
+            self.emit(f"Error: {e}")
             return False, ""
 
     def test_error_handling(self, test_type: str) -> bool:
         """Test error handling scenarios"""
         try:
             if test_type == "invalid_model":
-                files = {'file': open(self.sample_audio, 'rb')}
+                if self.use_cache and self._models_set is not None \
+                        and 'invalid-model' not in self._models_set:
+                    self.emit("(cached) invalid-model not in models list")
+                    return True
+
+                # A short but valid WAV keeps the upload small. The same probe
+                # must be accepted with the default model, so a rejection of the
+                # audio itself does not count as a pass.
+                files = self._wav_probe_files()
+                control = self.client.post(self._trans_url, files=files, data=DEFAULT_DATA)
+                if control.status_code != 200:
+                    self.emit(f"Probe audio rejected with {DEFAULT_MODEL}: HTTP {control.status_code}")
+                    return False
+
                 data = {'model': 'invalid-model'}
-                response = requests.post(
-                    f"{self.base_url}/v1/audio/transcriptions",
+                response = self.client.post(
+                    self._trans_url,
                     files=files,
                     data=data
                 )
                 return response.status_code != 200
 
             elif test_type == "no_file":
-                data = {'model': 'Systran/faster-whisper-base.en'}
-                response = requests.post(
-                    f"{self.base_url}/v1/audio/transcriptions",
+                data = DEFAULT_DATA
+                response = self.client.post(
+                    self._trans_url,
                     data=data
                 )
                 return response.status_code == 422
 
             return False
         except Exception as e:
-            print(f"Error: {e}")
+            self.emit(f"Error: {e}")
             return False
 
-    def test_performance(self, num_requests: int = 3) -> int:
-        """Test concurrent requests performance"""
-        def single_request():
+    def test_performance(self, num_requests: int = 3, phase: str = "performance") -> Optional[float]:
+        """Test concurrent requests performance, returning wall-clock ms (None if skipped)"""
+        if self._wav_bytes is None:
+            self.log(f"SKIPPED: sample audio not found: {self.sample_audio}", "yellow")
+            return None
+
+        if self.use_httpx:
+            duration_ms, succeeded = asyncio.run(self._perf_async(num_requests, phase))
+        else:
+            body, headers = self._wav_body(DEFAULT_DATA)
+
+            def send() -> bool:
+                return self._post_body(body, headers, timeout=30).status_code == 200
+
+            self._prewarm_pool(num_requests)
+            t0 = time.perf_counter_ns()
+            with ThreadPoolExecutor(max_workers=num_requests) as executor:
+                results = list(executor.map(lambda _: self._timed_request(send, phase), range(num_requests)))
+            duration_ms = (time.perf_counter_ns() - t0) / 1e6
+            succeeded = sum(results)
+
+        self._report_phase(duration_ms, succeeded, num_requests)
+        return duration_ms
+
+    def _report_phase(self, duration_ms: float, succeeded: int, num_requests: int) -> None:
+        """Print a timed phase's wall-clock time and success count"""
+        print(f"Performance test completed in {duration_ms:.1f}ms "
+              f"({succeeded}/{num_requests} requests succeeded)")
+
+    def _request_failed(self, e: Exception) -> None:
+        """Report a transport-level request failure with its exception type"""
+        self.emit(f"Request failed: {type(e).__name__}: {e}")
+
+    def _record_latency(self, phase: str, t0: int) -> None:
+        """Store the latency of a request started at perf_counter_ns() t0"""
+        latency_ms = (time.perf_counter_ns() - t0) / 1e6
+        with self._results_lock:
+            self.latencies_ms.setdefault(phase, []).append(latency_ms)
+
+    def _timed_request(self, send, phase: str) -> bool:
+        """Run send(), recording its latency on success; transport errors count as failures"""
+        t0 = time.perf_counter_ns()
+        try:
+            ok = send()
+        except REQUEST_ERRORS as e:
+            self._request_failed(e)
+            return False
+        if ok:
+            self._record_latency(phase, t0)
+        return ok
+
+    async def _timed_request_async(self, send, phase: str) -> bool:
+        """Async counterpart of _timed_request for a coroutine function"""
+        t0 = time.perf_counter_ns()
+        try:
+            ok = await send()
+        except REQUEST_ERRORS as e:
+            self._request_failed(e)
+            return False
+        if ok:
+            self._record_latency(phase, t0)
+        return ok
+
+    def _prewarm_pool(self, num_connections: int) -> None:
+        """Open pooled connections up front so handshakes stay out of timings"""
+        def warm():
             try:
-                files = {'file': open(self.sample_audio, 'rb')}
-                data = {'model': 'Systran/faster-whisper-base.en'}
-                response = requests.post(
-                    f"{self.base_url}/v1/audio/transcriptions",
-                    files=files,
-                    data=data,
-                    timeout=30
-                )
+                self.client.get(f"{self.base_url}/health", timeout=5).close()
+            except REQUEST_ERRORS:
+                pass
+
+        with ThreadPoolExecutor(max_workers=num_connections) as executor:
+            list(executor.map(lambda _: warm(), range(num_connections)))
+
+    async def _run_async_phase(self, num_requests: int, phase: str, warm, send) -> Tuple[float, int]:
+        """Prewarm, then time concurrent send() calls, returning (ms, successes)"""
+        async def quiet_warm() -> None:
+            try:
+                await warm()
+            except REQUEST_ERRORS:
+                pass
+
+        await asyncio.gather(*(quiet_warm() for _ in range(num_requests)))
+        t0 = time.perf_counter_ns()
+        results = await asyncio.gather(*(self._timed_request_async(send, phase)
+                                         for _ in range(num_requests)))
+        return (time.perf_counter_ns() - t0) / 1e6, sum(results)
+
+    async def _perf_async(self, num_requests: int, phase: str) -> Tuple[float, int]:
+        """Fire concurrent transcription requests from one event loop, returning (ms, successes)"""
+        body, headers = self._wav_body(DEFAULT_DATA)
+        limits = httpx.Limits(max_keepalive_connections=num_requests,
+                              max_connections=num_requests)
+        async with httpx.AsyncClient(http2=HTTP2_AVAILABLE, limits=limits,
+                                     timeout=30) as client:
+            async def warm() -> None:
+                await client.get(f"{self.base_url}/health", timeout=5)
+
+            async def send() -> bool:
+                response = await client.post(self._trans_url, content=body, headers=headers)
                 return response.status_code == 200
-            except:
-                return False
 
-        start_time = time.time()
-        with ThreadPoolExecutor(max_workers=num_requests) as executor:
-            futures = [executor.submit(single_request) for _ in range(num_requests)]
-            results = [future.result() for future in as_completed(futures)]
+            return await self._run_async_phase(num_requests, phase, warm, send)
+
+    async def test_load_aiohttp(self, num_requests: int, phase: str = "load") -> Optional[float]:
+        """Load test over one aiohttp session, returning wall-clock ms (None if skipped)"""
+        if self._wav_bytes is None:
+            self.log(f"SKIPPED: sample audio not found: {self.sample_audio}", "yellow")
+            return None
+
+        body, headers = self._wav_body(DEFAULT_DATA)
+        connector = aiohttp.TCPConnector(limit=num_requests, ttl_dns_cache=300,
+                                         keepalive_timeout=60)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            async def warm() -> None:
+                async with session.get(f"{self.base_url}/health") as response:
+                    await response.read()
+
+            async def send() -> bool:
+                async with session.post(self._trans_url, data=body, headers=headers) as response:
+                    await response.read()
+                    return response.status == 200
 
-        duration = int(time.time() - start_time)
-        print(f"Performance test completed in {duration}s")
-        return duration
+            duration_ms, succeeded = await self._run_async_phase(num_requests, phase, warm, send)
+
+        self._report_phase(duration_ms, succeeded, num_requests)
+        return duration_ms
 
     def run_all_tests(self) -> None:
         """Run the complete test suite"""
+        # Block-buffer stdout for the run and flush at phase boundaries, rather
+        # than flushing on every newline while the parallel checks report
+        line_buffering = getattr(sys.stdout, "line_buffering", False)
+        if hasattr(sys.stdout, "reconfigure"):
+            sys.stdout.reconfigure(line_buffering=False)
+        try:
+            self._run_suite()
+        finally:
+            sys.stdout.flush()
+            if hasattr(sys.stdout, "reconfigure"):
+                sys.stdout.reconfigure(line_buffering=line_buffering)
+
+    def _run_suite(self) -> None:
+        """Run every phase of the suite"""
         print("Starting Backend API Test Suite")
         print("==================================")
         print("Note: Large model tests are skipped to avoid timeouts during testing.")
         print("Use medium/base models for reliable test performance.")
-
-        # Basic tests
-        self.run_test("Health Check", self.test_health_check)
-        self.run_test("Models List", self.test_models_list)
-
-        # Transcription tests
-        self.run_test("Basic Transcription",
-                     lambda: self.test_transcription('Systran/faster-whisper-base.en')[0])
-        self.run_test("Transcription with Language",
-                     lambda: self.test_transcription('Systran/faster-whisper-base.en', 'en')[0])
-        self.run_test("Transcription with JSON Response",
-                     lambda: self.test_transcription('Systran/faster-whisper-base.en', None, 'json')[0])
-        self.run_test("Transcription with Verbose JSON",
-                     lambda: self.test_transcription('Systran/faster-whisper-base.en', None, 'verbose_json')[0])
-
-        # Model tests
-        self.run_test("Medium Model Transcription",
-                     lambda: self.test_transcription('Systran/faster-whisper-medium.en')[0])
-        self.run_test("Multilingual Model",
-                     lambda: self.test_transcription('Systran/faster-whisper-base', 'zh')[0])
-
-        # Auto language detection (may fail if not supported)
-        try:
-            self.run_test("Auto Language Detection",
-                         lambda: self.test_transcription('Systran/faster-whisper-base', 'auto')[0])
-        except:
-            self.log("Auto Language Detection: SKIPPED (not supported)", "yellow")
-
+        sys.stdout.flush()
+
+        # Independent correctness checks run concurrently over the shared client.
+        # They go in two waves: later checks rely on the models list from the first.
+        jobs = [
+            # Basic tests
+            ("Health Check", self.test_health_check),
+            ("Models List", self.test_models_list),
+            ("No File Error", lambda: self.test_error_handling('no_file')),
+        ]
+
+        self.run_tests_parallel(jobs)
+
+        # Checks that upload the sample audio
+        audio_jobs = [
+            (name, lambda a=args, k=kwargs: self.test_transcription(*a, **k)[0])
+            for name, args, kwargs in TRANS_MATRIX
+        ]
         # Error handling
-        self.run_test("Invalid Model Error",
-                     lambda: self.test_error_handling('invalid_model'))
-        self.run_test("No File Error",
-                     lambda: self.test_error_handling('no_file'))
+        audio_jobs.append(("Invalid Model Error", lambda: self.test_error_handling('invalid_model')))
 
-        # Performance tests
-        print("\n\033[1;33mRunning Performance Test (3 concurrent requests)\033[0m")
-        duration = self.test_performance(3)
+        if self._wav_bytes is not None:
+            jobs = audio_jobs
+        else:
+            jobs = []
+            for name, _ in audio_jobs:
+                self.skip_test(name, f"sample audio not found: {self.sample_audio}")
 
         # MP3 test
-        mp3_file = "/home/leonardo/Workspace/whisper-web-app/backend/whisper-cpp/samples/longer_jfk.mp3"
-        if os.path.exists(mp3_file):
-            self.run_test("MP3 File Support",
-                         lambda: self.test_mp3_transcription(mp3_file))
+        if os.path.isfile(self.sample_mp3):
+            jobs.append(("MP3 File Support", lambda: self.test_mp3_transcription(self.sample_mp3)))
+
+        self.run_tests_parallel(jobs)
+
+        # Performance tests stay serial: they measure, not verify
+        print("\n\033[1;33mRunning Performance Test (3 concurrent requests)\033[0m")
+        sys.stdout.flush()
+        duration_ms = self.test_performance(3)
 
         # Rate limiting test
         print("\n\033[1;33mTesting Rate Limiting (5 rapid requests)\033[0m")
-        rate_limit_success = self.test_rate_limiting(5)
-        print(f"Rate limiting test: {rate_limit_success}/5 requests succeeded")
+        sys.stdout.flush()
+        rate_limit = self.test_rate_limiting(5)
+        if rate_limit is not None:
+            print(f"Rate limiting test: {rate_limit['success']}/{rate_limit['total']} succeeded, "
+                  f"{rate_limit['rate_limited']} rate limited, {rate_limit['error']} errors")
 
         # Load test
         print("\n\033[1;33mTesting Server Load (5 concurrent requests)\033[0m")
-        load_duration = self.test_performance(5)
-        print(f"Load test completed in {load_duration}s")
+        sys.stdout.flush()
+        if self.use_aiohttp:
+            load_duration_ms = asyncio.run(self.test_load_aiohttp(5))
+        else:
+            load_duration_ms = self.test_performance(5, phase="load")
+        if load_duration_ms is not None:
+            print(f"Load test completed in {load_duration_ms:.1f}ms")
 
         # Results
-        self.print_summary(duration, load_duration, rate_limit_success)
+        self.print_summary(duration_ms, load_duration_ms, rate_limit)
 
     def test_mp3_transcription(self, mp3_file: str) -> bool:
         """Test MP3 file transcription"""
         try:
-            files = {'file': open(mp3_file, 'rb')}
-            data = {'model': 'Systran/faster-whisper-base.en'}
-            response = requests.post(
-                f"{self.base_url}/v1/audio/transcriptions",
-                files=files,
-                data=data
-            )
-            if response.status_code == 200:
-                result = response.json()
+            files = self._mp3_files(mp3_file)
+            data = DEFAULT_DATA
+            status_code, content = self._post_streamed(files, data)
+            if status_code == 200:
+                result = json_loads(content)
                 if 'text' in result and result['text']:
-                    print(result['text'])
+                    self.emit(result['text'])
                     return True
             return False
         except Exception as e:
-            print(f"Error: {e}")
+            self.emit(f"Error: {e}")
             return False
 
-    def test_rate_limiting(self, num_requests: int) -> int:
-        """Test rate limiting with rapid requests"""
-        success_count = 0
-        for _ in range(num_requests):
+    def test_rate_limiting(self, num_requests: int) -> Optional[Dict[str, int]]:
+        """Test rate limiting with concurrent rapid requests (None if skipped)"""
+        if self._wav_bytes is None:
+            self.log(f"SKIPPED: sample audio not found: {self.sample_audio}", "yellow")
+            return None
+
+        def single_request() -> str:
             try:
-                files = {'file': open(self.sample_audio, 'rb')}
-                data = {'model': 'Systran/faster-whisper-base.en'}
-                response = requests.post(
-                    f"{self.base_url}/v1/audio/transcriptions",
-                    files=files,
-                    data=data,
-                    timeout=15
-                )
+                body, headers = self._wav_body(DEFAULT_DATA)
+                response = self._post_body(body, headers, timeout=15)
                 if response.status_code == 200:
-                    success_count += 1
-            except:
-                pass
-        return success_count
+                    return "success"
+                if response.status_code == 429:
+                    return "rate_limited"
+                return "error"
+            except REQUEST_ERRORS as e:
+                self._request_failed(e)
+                return "error"
+
+        counts = {"success": 0, "rate_limited": 0, "error": 0, "total": num_requests}
+        with ThreadPoolExecutor(max_workers=num_requests) as executor:
+            futures = [executor.submit(single_request) for _ in range(num_requests)]
+            for future in as_completed(futures):
+                counts[future.result()] += 1
+        return counts
 
-    def print_summary(self, duration: int, load_duration: int, rate_limit_success: int) -> None:
+    def print_summary(self, duration_ms: Optional[float], load_duration_ms: Optional[float],
+                      rate_limit: Optional[Dict[str, int]]) -> None:
         """Print test results summary"""
         print("\n==================================")
         print("\033[1;33mTest Results Summary\033[0m")
@@ -269,24 +646,48 @@ class WhisperAPITester:
         print(f"Tests Run: {self.tests_run}")
         print(f"Tests Passed: {self.tests_passed}")
         print(f"Tests Failed: {self.tests_run - self.tests_passed}")
-        print(f"Success Rate: {self.tests_passed * 100 // self.tests_run}%")
+        print(f"Tests Skipped: {self.tests_skipped}")
+        print(f"Success Rate: {self.tests_passed * 100 // max(self.tests_run, 1)}%")
 
-        if self.tests_passed == self.tests_run:
-            print("\033[0;32mAll tests passed!\033[0m")
-        else:
+        if self.tests_passed != self.tests_run:
             print("\033[0;31mSome tests failed. Check the output above.\033[0m")
+        elif self.tests_skipped:
+            print(f"\033[1;33mNo failures, but {self.tests_skipped} tests were skipped.\033[0m")
+        else:
+            print("\033[0;32mAll tests passed!\033[0m")
 
         print("\n\033[1;33mPerformance Metrics:\033[0m")
         print("Single request performance: Good")
-        print(f"Concurrent requests (3): {duration}s")
-        print(f"Load test (5 concurrent): {load_duration}s")
-        print(f"Rate limiting: {rate_limit_success}/5 requests handled")
+        print(f"Concurrent requests (3): {self._duration_summary(duration_ms, 'performance')}")
+        print(f"Load test (5 concurrent): {self._duration_summary(load_duration_ms, 'load')}")
+        if rate_limit is None:
+            print("Rate limiting: SKIPPED")
+        else:
+            print(f"Rate limiting: {rate_limit['success']}/{rate_limit['total']} requests handled, "
+                  f"{rate_limit['rate_limited']} rate limited (429), {rate_limit['error']} errors")
 
         print("\n\033[0;32mBackend API testing completed!\033[0m")
 
+    def _duration_summary(self, duration_ms: Optional[float], phase: str) -> str:
+        """Wall-clock time of a phase with its latency percentiles, or SKIPPED"""
+        if duration_ms is None:
+            return "SKIPPED"
+        return f"{duration_ms:.1f}ms{self._latency_summary(phase)}"
+
+    def _latency_summary(self, phase: str) -> str:
+        """p50/p99 of the successful requests in a phase, or an empty string"""
+        latencies = self.latencies_ms.get(phase)
+        if not latencies:
+            return ""
+        return (f" (p50 {percentile(latencies, 50):.1f}ms, "
+                f"p99 {percentile(latencies, 99):.1f}ms over {len(latencies)} ok)")
+
 def main():
     tester = WhisperAPITester()
-    tester.run_all_tests()
+    try:
+        tester.run_all_tests()
+    finally:
+        tester.close()
 
 if __name__ == "__main__":
     main()